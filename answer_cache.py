@@ -0,0 +1,185 @@
+# A cache of chatbot answers to common health questions.
+# Questions are matched exactly after normalizing them, so "How do I prevent dengue?" reuses
+# the answer to "how to prevent dengue". MinHash over word pairs finds near copies of a question
+# (e.g. a word typed twice). Word order is part of the meaning ("ibuprofen after paracetamol" vs
+# "paracetamol after ibuprofen"), and questions that differ in any content word ("first" vs
+# "third trimester", "safe" vs "not safe", "2" vs "3 tablets") are never treated as the same:
+# a wrong hit here would be a wrong medical answer.
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Words that don't change what a question is about.
+# Never add negations (not, no, never, without, dont...), numbers or ordinals here.
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'what', 'whats', 'how', 'do', 'does', 'can', 'could',
+    'i', 'me', 'my', 'you', 'please', 'tell', 'about', 'to', 'of', 'for', 'in', 'on', 'and',
+    'should', 'would', 'some', 'any', 'there', 'it', 'be'
+}
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_question(text):
+    """
+    Lowercases, strips punctuation and drops filler words.
+    Returns the remaining content words in order. Apostrophes are dropped first,
+    so "isn't" stays one word ("isnt") instead of turning into "isn" and "t".
+    """
+    words = re.findall(r"[a-z0-9]+", re.sub(r"['’]", '', text.lower()))
+    return [w for w in words if w not in STOPWORDS]
+
+
+def shingles(words):
+    """
+    Returns the set of neighbouring word pairs, with markers for the start and end,
+    so the same words in another order give different shingles.
+    """
+    padded = ['^'] + list(words) + ['$']
+    return {f'{a} {b}' for a, b in zip(padded, padded[1:])}
+
+
+class AnswerCache:
+    """
+    An LRU + TTL cache of answers keyed on the normalized question and a scope
+    (e.g. the user's age group), with MinHash/LSH lookup for near copies of a question.
+    A near match needs exactly the same set of content words and at least `threshold`
+    overlap (Jaccard) between the word pairs of both questions.
+    """
+
+    def __init__(self, max_size=5000, ttl=24 * 60 * 60, threshold=0.9, num_perm=64, bands=16):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(1234)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+        self._entries = OrderedDict()  # key -> (expires_at, signature, answer, content word set, shingles)
+        self._buckets = {}             # (scope, band, band hash) -> set of keys
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def get(self, question, scope=''):
+        """
+        Returns a cached answer for this question (or the same question reworded), or None.
+        """
+        words = normalize_question(question)
+        if not words:
+            return None
+        key = (scope, ' '.join(words))
+        now = time.monotonic()
+
+        with self._lock:
+            # 1. Exact match on the normalized question
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self.hits += 1
+                return entry[2]
+
+            # 2. Near match through the LSH buckets, only between questions with the same content words.
+            # The buckets only find candidates; the score is the exact overlap of their word pairs.
+            question_shingles = shingles(words)
+            signature = self._signature(question_shingles)
+            word_set = frozenset(words)
+            best_key, best_score = None, 0.0
+            for bucket_key in self._bucket_keys(scope, signature):
+                for candidate in self._buckets.get(bucket_key, ()):
+                    candidate_entry = self._entries.get(candidate)
+                    if candidate_entry is None or candidate_entry[3] != word_set:
+                        continue
+                    score = jaccard(question_shingles, candidate_entry[4])
+                    if score > best_score:
+                        best_key, best_score = candidate, score
+
+            if best_key is not None and best_score >= self.threshold:
+                entry = self._live_entry(best_key, now)
+                if entry is not None:
+                    self.similar_hits += 1
+                    return entry[2]
+
+            self.misses += 1
+            return None
+
+    def set(self, question, answer, scope=''):
+        words = normalize_question(question)
+        if not words:
+            return
+        key = (scope, ' '.join(words))
+        question_shingles = shingles(words)
+        signature = self._signature(question_shingles)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, signature, answer, frozenset(words),
+                                  question_shingles)
+            for bucket_key in self._bucket_keys(scope, signature):
+                self._buckets.setdefault(bucket_key, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def purge(self):
+        """
+        Drops every cached answer. Returns how many there were.
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._buckets.clear()
+            return count
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses
+            }
+
+    def _live_entry(self, key, now):
+        # Must be called while holding self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        # Must be called while holding self._lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket_key in self._bucket_keys(key[0], entry[1]):
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def _signature(self, question_shingles):
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'big')
+                  for s in question_shingles]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    def _bucket_keys(self, scope, signature):
+        return [(scope, band, signature[band * self.rows:(band + 1) * self.rows])
+                for band in range(self.bands)]
+
+
+def jaccard(a, b):
+    """
+    Shared items divided by all items: 1.0 for equal sets, 0.0 for sets with nothing in common.
+    """
+    return len(a & b) / len(a | b) if a or b else 1.0
@@ -0,0 +1,133 @@
+# A local fake of the Gemini API for load tests.
+# Run it on its own:   python -m bench.fake_gemini --latency 0.8 --chunk-delay 0.05
+# and start the app with LLM_BACKEND=http LLM_STUB_URL=http://127.0.0.1:8765
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_REPLY = (
+    "Staying hydrated, getting enough sleep and washing your hands regularly are simple ways "
+    "to stay healthy. If your symptoms last more than a few days, please see a doctor. "
+    "Disclaimer: I am an AI assistant and not a medical professional. Please consult a doctor for medical advice."
+)
+
+
+class FakeGeminiSettings:
+    """
+    Tunable behaviour of the fake server.
+    `latency` is the delay before the first token (seconds), `jitter` adds up to that much at random,
+    `chunk_delay` is the delay between streamed chunks and `error_rate` is the share of calls that fail.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.0, chunk_delay=0.02, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def first_token_delay(self):
+        with self.lock:
+            self.calls += 1
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+def fake_reply(prompt, counter):
+    """
+    Answers shaped like the real ones, so the app parses them the same way.
+    """
+    if 'MYTH:' in prompt:
+        return f"MYTH: Load test myth number {counter}. FACT: Fact: This came from the fake Gemini server."
+    if 'health summary' in prompt:
+        return ("We noticed a pattern of mild symptoms. Drinking more water and resting may help. "
+                "Disclaimer: I am an AI assistant and not a medical professional. Please consult a doctor for medical advice.")
+    return CHAT_REPLY
+
+
+def make_handler(settings):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            prompt = json.loads(self.rfile.read(length) or b'{}').get('prompt', '')
+
+            time.sleep(settings.first_token_delay())
+            if settings.should_fail():
+                return self._send_json(503, {'error': 'Fake upstream failure.'})
+
+            text = fake_reply(prompt, settings.calls)
+            if self.path == '/generate':
+                return self._send_json(200, {'text': text})
+            if self.path == '/stream':
+                return self._send_stream(text)
+            self._send_json(404, {'error': 'Unknown path.'})
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, text):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for word in text.split(' '):
+                line = (json.dumps({'text': word + ' '}) + '\n').encode('utf-8')
+                self.wfile.write(f'{len(line):X}\r\n'.encode() + line + b'\r\n')
+                self.wfile.flush()
+                if settings.chunk_delay:
+                    time.sleep(settings.chunk_delay)
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, format, *args):
+            pass  # Keep load test output readable
+
+    return Handler
+
+
+def start_fake_gemini(settings, host='127.0.0.1', port=8765):
+    """
+    Starts the fake server on a background thread and returns it (call .shutdown() to stop).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(settings))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-gemini', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Gemini server for load tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds before the first token.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many extra seconds, at random.')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='Seconds between streamed chunks.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls that fail (0-1).')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    settings = FakeGeminiSettings(args.latency, args.jitter, args.chunk_delay, args.error_rate, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(settings))
+    print(f"Fake Gemini listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+# Load test / benchmark for CogniCare.
+#
+# By default this starts everything locally: a fake Gemini server, the app on a
+# threaded dev server, and a fresh SQLite database. Then it seeds users with
+# symptom histories of the given sizes and drives the main flows concurrently.
+#
+#   python -m bench.run_bench --users 20 --duration 30 --history 0,200,5000
+#   python -m bench.run_bench --json results.json
+#   python -m bench.run_bench --compare results.json --max-regression 0.25
+#
+# Use --url to point it at an already running app (which should use LLM_BACKEND=http
+# against `python -m bench.fake_gemini`), and --database-url to test against Postgres.
+import argparse
+import datetime
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from bench.fake_gemini import FakeGeminiSettings, start_fake_gemini
+
+FLOW_WEIGHTS = {
+    'dashboard': 20,
+    'calendar': 20,
+    'checklist': 15,
+    'chat': 10,
+    'chat_stream': 10,
+    'log_symptom': 10,
+    'get_myth': 10,
+    'symptom_stats': 5,
+    'analyze_trends': 5,
+    'login': 5
+}
+
+QUESTIONS = [
+    "How to prevent dengue?", "What are the symptoms of flu?", "How much water should I drink?",
+    "Is it safe to exercise with a cold?", "How can I sleep better?", "What causes headaches?",
+    "How do I know if I have a fever?", "How to avoid food poisoning?", "Is coffee bad for you?",
+    "How to lower blood pressure naturally?", "What are signs of dehydration?", "How to prevent malaria?"
+]
+SYMPTOMS = ['Headache', 'Fever', 'Cough', 'Fatigue', 'Stomach Ache', 'Other']
+SEVERITIES = ['Mild', 'Moderate', 'Severe']
+
+
+class Results:
+    """
+    Thread-safe latency samples (in seconds) and error counts per route.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, wall_seconds):
+        report = {}
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            report[name] = {
+                'count': len(ordered),
+                'errors': self.errors.get(name, 0),
+                'rps': round(len(ordered) / wall_seconds, 2),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 1),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 1),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 1)
+            }
+        return report
+
+
+def percentile(ordered, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class BenchClient:
+    """
+    One simulated browser: its own cookies, talking to the app over real HTTP.
+    """
+
+    def __init__(self, base_url, results):
+        self.base_url = base_url.rstrip('/')
+        self.results = results
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(self, name, method, path, payload=None, body=None, content_type='application/json', record=True):
+        """
+        Sends one request, reads the whole body and records how long it took.
+        Returns (status, parsed JSON or None).
+        """
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        if body is not None:
+            request.add_header('Content-Type', content_type)
+
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                status, raw = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, raw = e.code, e.read()
+        except OSError:
+            status, raw = 0, b''
+        if record:
+            self.results.record(name, time.perf_counter() - started, 200 <= status < 400)
+
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+    def stream_chat(self, message):
+        """
+        Reads /chat/stream, recording both the time to the first model chunk and the full reply.
+        """
+        request = urllib.request.Request(
+            self.base_url + '/chat/stream', data=json.dumps({'message': message}).encode('utf-8'),
+            method='POST', headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        first_chunk, ok = None, False
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                frames = 0
+                for line in response:
+                    if line.startswith(b'data:'):
+                        frames += 1
+                        # Frame 1 is the greeting, frame 2 is the first text from the model
+                        if frames == 2 and first_chunk is None:
+                            first_chunk = time.perf_counter() - started
+                    if line.startswith(b'event: done'):
+                        ok = True
+        except OSError:
+            pass
+        total = time.perf_counter() - started
+        self.results.record('chat_stream (first chunk)', first_chunk if first_chunk is not None else total, ok)
+        self.results.record('chat_stream', total, ok)
+
+
+def seed_user(client, email, password, history_size, rng):
+    """
+    Registers a user, logs in and imports `history_size` symptom logs spread over the last three years.
+    """
+    client.call('seed', 'POST', '/register', {
+        'name': 'Bench User', 'email': email, 'age': rng.randint(18, 80),
+        'gender': 'Other', 'password': password
+    }, record=False)
+    status, _ = client.call('seed', 'POST', '/login', {'email': email, 'password': password}, record=False)
+    if status != 200:
+        raise RuntimeError(f"Could not log in seeded user {email} (status {status}).")
+
+    if history_size:
+        today = datetime.date.today()
+        lines = []
+        for _ in range(history_size):
+            lines.append(json.dumps({
+                'log_date': (today - datetime.timedelta(days=rng.randint(0, 3 * 365))).isoformat(),
+                'symptom': rng.choice(SYMPTOMS),
+                'severity': rng.choice(SEVERITIES),
+                'notes': 'Seeded by the benchmark.'
+            }))
+        status, result = client.call('seed', 'POST', '/symptoms/import', body='\n'.join(lines).encode('utf-8'),
+                                     content_type='application/x-ndjson', record=False)
+        if status != 201:
+            raise RuntimeError(f"Could not import history for {email}: {result}")
+
+
+def run_flow(flow, client, email, password, rng, repeat_rate):
+    today = datetime.date.today()
+
+    if flow == 'login':
+        client.call('login', 'POST', '/login', {'email': email, 'password': password})
+    elif flow == 'dashboard':
+        client.call('dashboard', 'GET', '/dashboard.html')
+    elif flow == 'get_myth':
+        client.call('get_myth', 'GET', '/api/get_myth')
+    elif flow in ('chat', 'chat_stream'):
+        question = rng.choice(QUESTIONS)
+        if rng.random() >= repeat_rate:
+            question += f" (case {uuid.uuid4().hex[:8]})"  # A question nobody asked before
+        if flow == 'chat':
+            client.call('chat', 'POST', '/chat', {'message': question})
+        else:
+            client.stream_chat(question)
+    elif flow == 'calendar':
+        month_start = today.replace(day=1)
+        start = month_start - datetime.timedelta(days=7)
+        end = month_start + datetime.timedelta(days=42)
+        client.call('calendar', 'GET', f'/get_symptoms?start={start.isoformat()}&end={end.isoformat()}')
+    elif flow == 'log_symptom':
+        client.call('log_symptom', 'POST', '/log_symptom', {
+            'symptom': rng.choice(SYMPTOMS), 'severity': rng.choice(SEVERITIES),
+            'log_date': (today - datetime.timedelta(days=rng.randint(0, 30))).isoformat(), 'notes': ''
+        })
+    elif flow == 'symptom_stats':
+        client.call('symptom_stats', 'GET', '/api/symptom_stats')
+    elif flow == 'analyze_trends':
+        started = time.perf_counter()
+        status, result = client.call('analyze_trends (submit)', 'POST', '/analyze_trends')
+        delay = 0.5  # Same short polls with a growing delay as calendar.html
+        while status == 202 or (result and result.get('status') in ('queued', 'running')):
+            time.sleep(delay)
+            delay = min(delay * 1.5, 5)
+            status, result = client.call('analyze_trends (poll)', 'GET', f"/analyze_trends/{result['job_id']}?wait=1")
+        client.results.record('analyze_trends (total)', time.perf_counter() - started, status == 200)
+    elif flow == 'checklist':
+        temp_id = f'tmp-{uuid.uuid4().hex[:8]}'
+        status, result = client.call('checklist (add)', 'POST', '/checklist/batch', {
+            'ops': [{'op': 'add', 'temp_id': temp_id, 'content': 'Drink a glass of water'}]
+        })
+        if status == 200 and result['added']:
+            item_id = result['added'][0]['item']['item_id']
+            client.call('checklist (toggle+delete)', 'POST', '/checklist/batch', {
+                'ops': [{'op': 'toggle', 'item_id': item_id, 'is_completed': True},
+                        {'op': 'delete', 'item_id': item_id}]
+            })
+
+
+def start_local_app(args):
+    """
+    Imports the app with a fresh database and the fake Gemini backend, and serves it on a free port.
+    """
+    # Always set explicitly: an exported DATABASE_URL must never get tables created and test data seeded in it
+    os.environ['DATABASE_URL'] = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='cognicare-bench-'), 'bench.db')
+    os.environ['LLM_BACKEND'] = 'http'
+    os.environ['LLM_STUB_URL'] = f'http://127.0.0.1:{args.fake_port}'
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', str(args.bcrypt_rounds))
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from werkzeug.serving import make_server
+    import app as cognicare
+
+    app = cognicare.create_app()
+    with app.app_context():
+        cognicare.db.create_all()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No per-request access log
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-app', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.port}'
+
+
+def compare(report, baseline_path, max_regression):
+    """
+    Prints p95 changes against a saved run. Returns False if any route got slower than allowed.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['routes']
+
+    ok = True
+    print(f"\nCompared with {baseline_path} (allowed p95 regression: {max_regression:.0%})")
+    for name, stats in report.items():
+        before = baseline.get(name)
+        if not before or not before['p95_ms']:
+            continue
+        change = stats['p95_ms'] / before['p95_ms'] - 1
+        flag = 'REGRESSION' if change > max_regression else 'ok'
+        ok = ok and flag == 'ok'
+        print(f"  {name:<28} p95 {before['p95_ms']:>8.1f} -> {stats['p95_ms']:>8.1f} ms  ({change:+.0%})  {flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CogniCare routes under concurrent load.')
+    parser.add_argument('--url', help='Benchmark an already running app instead of starting one.')
+    parser.add_argument('--database-url', help='Database for the locally started app (default: a fresh SQLite file).')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent simulated users.')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run the load for.')
+    parser.add_argument('--history', default='0,100,2000',
+                        help='Comma-separated symptom history sizes; users are spread across them.')
+    parser.add_argument('--flows', default=','.join(FLOW_WEIGHTS), help='Comma-separated flows to run.')
+    parser.add_argument('--chat-repeat-rate', type=float, default=0.5,
+                        help='Share of chat questions that repeat a common question (0-1).')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for datasets and flow choice.')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10, help='bcrypt cost for the locally started app.')
+    parser.add_argument('--no-fake', action='store_true', help="Don't start the fake Gemini server.")
+    parser.add_argument('--fake-port', type=int, default=8765)
+    parser.add_argument('--fake-latency', type=float, default=0.5, help='Fake Gemini seconds to first token.')
+    parser.add_argument('--fake-jitter', type=float, default=0.1, help='Fake Gemini random extra latency.')
+    parser.add_argument('--fake-chunk-delay', type=float, default=0.02, help='Fake Gemini seconds between chunks.')
+    parser.add_argument('--fake-error-rate', type=float, default=0.0, help='Share of fake Gemini calls that fail.')
+    parser.add_argument('--json', help='Write the results to this file.')
+    parser.add_argument('--compare', help='A previous --json file to compare p95 latencies against.')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Fail (exit code 1) if any p95 is this much slower than --compare.')
+    args = parser.parse_args()
+
+    flows = [f for f in args.flows.split(',') if f]
+    unknown = set(flows) - set(FLOW_WEIGHTS)
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(sorted(unknown))}")
+    history_sizes = [int(h) for h in args.history.split(',') if h]
+
+    # 1. Start the fake model server and (unless --url) the app
+    if not args.no_fake:
+        start_fake_gemini(FakeGeminiSettings(args.fake_latency, args.fake_jitter, args.fake_chunk_delay,
+                                             args.fake_error_rate, args.seed), port=args.fake_port)
+    base_url = args.url
+    if not base_url:
+        _, base_url = start_local_app(args)
+    print(f"Benchmarking {base_url} with {args.users} users for {args.duration:.0f}s")
+
+    # 2. Seed one account per simulated user
+    run_id = uuid.uuid4().hex[:8]
+    results = Results()
+    users = []
+    for index in range(args.users):
+        rng = random.Random(args.seed * 1000 + index)
+        client = BenchClient(base_url, results)
+        email, password = f'bench-{run_id}-{index}@example.com', 'bench-password'
+        history = history_sizes[index % len(history_sizes)] if history_sizes else 0
+        seed_user(client, email, password, history, rng)
+        users.append((client, email, password, rng))
+    print(f"Seeded {len(users)} users with histories of {history_sizes} logs")
+
+    # 3. Drive weighted random flows until time is up
+    weights = [FLOW_WEIGHTS[f] for f in flows]
+    stop_at = time.monotonic() + args.duration
+
+    def worker(client, email, password, rng):
+        while time.monotonic() < stop_at:
+            flow = rng.choices(flows, weights)[0]
+            run_flow(flow, client, email, password, rng, args.chat_repeat_rate)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=user) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    # 4. Report
+    report = results.summary(wall)
+    total = sum(stats['count'] for stats in report.values())
+    print(f"\n{'route':<28} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in report.items():
+        print(f"{name:<28} {stats['count']:>7} {stats['errors']:>7} {stats['rps']:>8.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+    print(f"\n{total} requests in {wall:.1f}s ({total / wall:.1f} req/s)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'wall_seconds': wall, 'routes': report}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.compare and not compare(report, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
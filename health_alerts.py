@@ -0,0 +1,136 @@
+# Regional health alerts driven by a rules file (see data/health_alerts.json).
+# The rules are compiled once into a region -> month lookup, and the file is
+# re-read automatically when it changes on disk.
+import json
+import os
+import threading
+import time
+
+from cache import LRUCache
+
+
+def compile_rules(config):
+    """
+    Turns the rules file into {region: {month: alert}} plus a default alert.
+    When several rules match a region and month, the highest-priority level wins
+    (ties go to the rule that comes first in the file). Region "*" matches everywhere.
+    """
+    levels = config.get('levels', {})
+    seasons = config.get('seasons', {})
+
+    def make_alert(rule):
+        if not isinstance(rule['level'], str):
+            raise ValueError(f"Rule for {rule.get('illness')} needs 'level' to be a name like \"High Risk\".")
+        level = levels.get(rule['level'], {})
+        return {
+            'level': rule['level'],
+            'illness': rule['illness'],
+            'message': rule['message'],
+            'color_class': rule.get('color_class') or level.get('color_class', 'alert-green')
+        }
+
+    index = {}
+    priorities = {}
+    for rule in config.get('rules', []):
+        months = rule.get('months') or seasons.get(rule.get('season'), [])
+        regions = rule.get('regions', ['*'])
+        if not months:
+            raise ValueError(f"Rule for {rule.get('illness')} has no months or known season.")
+        # A typo like "months": 9 or "regions": "Bengaluru" must be reported here, not break every lookup
+        if not isinstance(months, list) or not all(is_month(m) for m in months):
+            raise ValueError(f"Rule for {rule.get('illness')} needs 'months' to be a list of numbers from 1 to 12.")
+        if not isinstance(regions, list) or not all(isinstance(r, str) for r in regions):
+            raise ValueError(f"Rule for {rule.get('illness')} needs 'regions' to be a list of names.")
+        alert = make_alert(rule)
+        priority = levels.get(rule['level'], {}).get('priority', 0)
+
+        for region in regions:
+            region = normalize_region(region)
+            for month in months:
+                key = (region, month)
+                if key not in priorities or priority > priorities[key]:
+                    priorities[key] = priority
+                    index.setdefault(region, {})[month] = alert
+
+    return index, make_alert(config['default'])
+
+
+def is_month(value):
+    # bool is a subclass of int, so rule out true/false explicitly
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= 12
+
+
+def normalize_region(region):
+    return ' '.join((region or '').lower().split()) or '*'
+
+
+class AlertEngine:
+    """
+    Looks up the alert for a region and date in constant time.
+
+    Results are cached per (region, year, month). The rules file is checked for
+    changes at most every `reload_interval` seconds and recompiled when it changed.
+    """
+
+    def __init__(self, path, reload_interval=30, cache_size=5000):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._cache = LRUCache(max_size=cache_size)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0
+        # (generation, index, default), swapped as one value so a lookup never mixes two versions
+        self._rules = (0, {}, None)
+        self._load()
+
+    def get_alert(self, region, date):
+        self._maybe_reload()
+        generation, index, default = self._rules
+        # The generation is part of the key, so a lookup that started before a reload
+        # can't leave an answer from the old rules in the cache
+        key = (generation, normalize_region(region), date.year, date.month)
+        alert = self._cache.get(key)
+        if alert is None:
+            region_rules = index.get(key[1], {})
+            alert = region_rules.get(date.month) or index.get('*', {}).get(date.month) or default
+            self._cache.set(key, alert)
+        return dict(alert)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self._load()
+
+    def _load(self):
+        # Keeps the previous rules if the new file is broken, so a bad edit can't take the dashboard down
+        mtime = None
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                index, default = compile_rules(json.load(f))
+        except Exception as e:  # Any mistake in the file, not just the ones compile_rules checks for
+            print(f"Error loading health alert rules from {self.path}: {e}")
+            self._mtime = mtime  # Don't retry until the file changes again
+            generation, index, default = self._rules
+            if default is None:
+                self._rules = (generation + 1, index, {
+                    'level': 'Low Risk',
+                    'illness': 'General Alert',
+                    'message': 'Health risks are currently low. Continue to follow good hygiene practices.',
+                    'color_class': 'alert-green'
+                })
+            return
+
+        self._rules = (self._rules[0] + 1, index, default)
+        self._mtime = mtime
+        self._cache.clear()  # Old generations can't be hit any more, this just frees the memory
@@ -0,0 +1,99 @@
+# A small in-process job queue, so slow work (like AI trend analysis) runs on its own
+# worker threads and the web workers can answer right away.
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting. Routes turn this into a 503."""
+
+
+class Job:
+    """
+    One unit of background work and, once finished, its result.
+    """
+
+    def __init__(self, owner, key):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.key = key
+        self.status = 'queued'  # queued -> running -> done / failed
+        self.result = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {'job_id': self.id, 'status': self.status}
+
+
+class JobQueue:
+    """
+    Runs jobs on a bounded thread pool.
+
+    Submitting a job with the same `key` as one that is still queued or running
+    returns that job instead of starting another. Finished jobs are kept for
+    `retention` seconds so clients can collect the result, then forgotten.
+    """
+
+    def __init__(self, max_workers=2, max_pending=100, retention=600):
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+        self._jobs = {}     # job id -> Job
+        self._active = {}   # dedupe key -> Job still queued or running
+        self._lock = threading.Lock()
+
+    def submit(self, owner, key, fn, *args):
+        with self._lock:
+            self._expire()
+            job = self._active.get(key)
+            if job is not None:
+                return job
+            if len(self._active) >= self.max_pending:
+                raise QueueFull("Too many jobs waiting.")
+
+            job = Job(owner, key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id, owner):
+        """
+        Returns the job if it exists, hasn't expired and belongs to `owner`.
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def _run(self, job, fn, args):
+        job.status = 'running'
+        try:
+            job.result = fn(*args)
+            job.status = 'done'
+        except Exception as e:
+            print(f"Error running job {job.id}: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+            job.done.set()
+
+    def _expire(self):
+        # Must be called while holding self._lock
+        cutoff = time.monotonic() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,331 @@
+# This file is the single way our routes talk to the AI model.
+# It reuses one model client, limits how many calls run at once, gives every call a deadline,
+# stops calling a failing upstream for a while (circuit breaker) and merges identical
+# prompts that are asked at the same time into one call.
+import json
+import threading
+import time
+import urllib.request
+
+
+class LLMError(Exception):
+    """Base class for errors raised by the gateway."""
+
+
+class LLMUnavailable(LLMError):
+    """Raised straight away when the circuit is open or too many calls are already running."""
+
+
+class LLMTimeout(LLMError):
+    """Raised when a call could not finish before its deadline."""
+
+
+class GeminiBackend:
+    """
+    Talks to Google Gemini. The model client is created once and reused for every call.
+    The Google library is only imported then, so starting the app doesn't pay for it.
+    """
+
+    def __init__(self, model_name='gemini-2.5-flash', api_key=None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    if self.api_key:
+                        genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def warm(self):
+        """
+        Imports the Google library and creates the model client ahead of the first call.
+        """
+        self._get_model()
+
+    def generate(self, prompt, timeout):
+        response = self._get_model().generate_content(prompt, request_options={'timeout': timeout})
+        return response.text
+
+    def stream(self, prompt, timeout):
+        response = self._get_model().generate_content(prompt, stream=True, request_options={'timeout': timeout})
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class StubBackend:
+    """
+    A local stand-in for Gemini, used for tests and load tests.
+    `latency` is the delay before the first token, `chunk_delay` the delay between streamed chunks.
+    """
+
+    def __init__(self, latency=0.0, chunk_delay=0.0, responder=None):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.responder = responder or stub_reply
+        self.calls = 0
+
+    def generate(self, prompt, timeout):
+        self.calls += 1
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise LLMTimeout("Stub backend took longer than the deadline.")
+        return self.responder(prompt)
+
+    def stream(self, prompt, timeout):
+        self.calls += 1
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise LLMTimeout("Stub backend took longer than the deadline.")
+        for word in self.responder(prompt).split(' '):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield word + ' '
+
+
+class HTTPStubBackend:
+    """
+    Talks to a fake model server over HTTP (see bench/fake_gemini.py), so load tests
+    exercise real network calls without touching Google.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def generate(self, prompt, timeout):
+        with urllib.request.urlopen(self._request('/generate', prompt), timeout=timeout) as response:
+            return json.loads(response.read())['text']
+
+    def stream(self, prompt, timeout):
+        with urllib.request.urlopen(self._request('/stream', prompt), timeout=timeout) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)['text']
+
+    def _request(self, path, prompt):
+        return urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps({'prompt': prompt}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+
+
+def stub_reply(prompt):
+    """
+    Canned answers that are shaped like the real ones, so the app's parsing keeps working.
+    """
+    if 'MYTH:' in prompt:
+        return ("MYTH: Stub myth number %d. FACT: This answer came from the local stub backend."
+                % (abs(hash(prompt + str(time.monotonic()))) % 1000))
+    return ("This is a reply from the local stub backend. "
+            "Disclaimer: I am an AI assistant and not a medical professional. Please consult a doctor for medical advice.")
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` failures in a row. While open every call fails fast.
+    After `cooldown` seconds one trial call is let through; success closes it again.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def cancel_trial(self):
+        with self._lock:
+            self._trial_running = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class _Flight:
+    # One in-progress call that other requests with the same prompt can wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMGateway:
+    """
+    Wraps a backend with a concurrency limit, deadlines, retries, a circuit breaker
+    and single-flight coalescing of identical prompts.
+    """
+
+    def __init__(self, backend, max_in_flight=8, timeout=20.0, max_retries=1,
+                 breaker_threshold=5, breaker_cooldown=30.0, observer=None):
+        self.backend = backend
+        # Optional callback: observer(kind, seconds, outcome, prompt_chars, output_chars)
+        self.observer = observer
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    def warm(self):
+        """
+        Lets the backend do its one-time setup now (backends without any just skip this).
+        """
+        warm = getattr(self.backend, 'warm', None)
+        if warm is not None:
+            warm()
+
+    def generate(self, prompt, timeout=None):
+        """
+        Returns the model's full answer for `prompt`.
+        If the same prompt is already being generated, waits for that call instead of starting another.
+        """
+        started = time.monotonic()
+        deadline = started + (timeout or self.timeout)
+
+        with self._flights_lock:
+            flight = self._flights.get(prompt)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[prompt] = flight
+
+        if not is_leader:
+            if not flight.done.wait(max(deadline - time.monotonic(), 0)):
+                self._observe('generate', started, LLMTimeout(), prompt)
+                raise LLMTimeout("Timed out waiting for an identical request.")
+            self._observe('generate', started, flight.error, prompt, flight.result, coalesced=True)
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call(prompt, deadline)
+            self._observe('generate', started, None, prompt, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            self._observe('generate', started, e, prompt)
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[prompt]
+            flight.done.set()
+
+    def stream(self, prompt, timeout=None):
+        """
+        Yields the model's answer chunk by chunk. The call holds one in-flight slot until it ends.
+        """
+        started = time.monotonic()
+        deadline = started + (timeout or self.timeout)
+        try:
+            self._enter(deadline)
+        except LLMError as e:
+            self._observe('stream', started, e, prompt)
+            raise
+
+        output_chars = 0
+        recorded = False
+        try:
+            for chunk in self.backend.stream(prompt, timeout=max(deadline - time.monotonic(), 0.1)):
+                output_chars += len(chunk)
+                yield chunk
+        except Exception as e:
+            recorded = True
+            self.breaker.record_failure()
+            self._observe('stream', started, e, prompt)
+            raise
+        else:
+            recorded = True
+            self.breaker.record_success()
+            self._observe('stream', started, None, prompt, output_chars=output_chars)
+        finally:
+            # The client went away mid-stream (GeneratorExit): we learned nothing about the
+            # upstream, but a half-open trial must still be released or the breaker stays shut
+            if not recorded:
+                self.breaker.cancel_trial()
+            self._slots.release()
+
+    def _observe(self, kind, started, error, prompt, output='', coalesced=False, output_chars=None):
+        if self.observer is None:
+            return
+        if error is None:
+            outcome = 'coalesced' if coalesced else 'ok'
+        elif isinstance(error, LLMUnavailable):
+            outcome = 'unavailable'
+        elif isinstance(error, LLMTimeout):
+            outcome = 'timeout'
+        else:
+            outcome = 'error'
+        if output_chars is None:
+            output_chars = len(output or '')
+        # Coalesced calls didn't send anything upstream, so they don't add tokens
+        prompt_chars = 0 if coalesced else len(prompt)
+        if coalesced:
+            output_chars = 0
+        try:
+            self.observer(kind, time.monotonic() - started, outcome, prompt_chars, output_chars)
+        except Exception as e:
+            print(f"Error in LLM observer: {e}")
+
+    def _call(self, prompt, deadline):
+        self._enter(deadline)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMTimeout("Deadline passed before the model answered.")
+                    text = self.backend.generate(prompt, timeout=remaining)
+                    self.breaker.record_success()
+                    return text
+                except Exception:
+                    attempt += 1
+                    if attempt > self.max_retries or deadline - time.monotonic() <= 0:
+                        self.breaker.record_failure()
+                        raise
+                    # Short backoff before trying again
+                    time.sleep(min(0.2 * attempt, max(deadline - time.monotonic(), 0)))
+        finally:
+            self._slots.release()
+
+    def _enter(self, deadline):
+        # Fail fast if the upstream is known to be down, then wait (until the deadline) for a free slot
+        if not self.breaker.allow():
+            raise LLMUnavailable("Circuit breaker is open.")
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            # We never reached the upstream, so this doesn't count for or against it
+            self.breaker.cancel_trial()
+            raise LLMUnavailable("Too many AI calls in flight.")
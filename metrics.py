@@ -0,0 +1,207 @@
+# Lightweight request, database and AI metrics, exposed in Prometheus text format at /metrics.
+# Everything lives in memory in this process; each worker reports its own numbers.
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_label_text(zip(self.label_names, label_values))} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, series in sorted(self._values.items()):
+                labels = list(zip(self.label_names, label_values))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_label_text(labels + [("le", bound)])} {cumulative}')
+                lines.append(f'{self.name}_bucket{_label_text(labels + [("le", "+Inf")])} {series[-1]}')
+                lines.append(f'{self.name}_sum{_label_text(labels)} {series[-2]}')
+                lines.append(f'{self.name}_count{_label_text(labels)} {series[-1]}')
+        return lines
+
+
+def gauge_lines(name, help_text, value):
+    """
+    Renders a single unlabelled gauge, for use in collectors.
+    """
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+
+
+class Metrics:
+    """
+    Collects per-route latency, database query counts/timings, AI call timings,
+    fallbacks and errors, and renders them for Prometheus.
+    """
+
+    def __init__(self):
+        self.request_latency = Histogram(
+            'cognicare_http_request_duration_seconds', 'Time spent handling each request.',
+            ('route', 'method', 'status'))
+        self.request_errors = Counter(
+            'cognicare_http_request_errors_total', 'Requests that raised an unhandled exception.', ('route',))
+        self.db_queries = Counter(
+            'cognicare_db_queries_total', 'SQL statements executed, by route.', ('route',))
+        self.db_latency = Histogram(
+            'cognicare_db_query_duration_seconds', 'Time spent in each SQL statement.', ('route',))
+        self.llm_latency = Histogram(
+            'cognicare_llm_call_duration_seconds', 'Time spent in each AI model call.', ('kind', 'outcome'))
+        self.llm_tokens = Counter(
+            'cognicare_llm_estimated_tokens_total',
+            'Estimated AI tokens (about 4 characters each), by direction.', ('direction',))
+        self.fallbacks = Counter(
+            'cognicare_fallbacks_total', 'Times a feature served its fallback instead of an AI answer.', ('feature',))
+        self._collectors = []
+        self.slow_request_ms = 0
+
+    def init_app(self, app, slow_request_ms=0):
+        """
+        Hooks into every request and every SQL statement. `slow_request_ms` > 0 turns on the slow request log.
+        """
+        self.slow_request_ms = slow_request_ms
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        # The SQL hooks are global, so only add them once even if several apps are created
+        if not event.contains(Engine, 'before_cursor_execute', self._before_query):
+            event.listen(Engine, 'before_cursor_execute', self._before_query)
+            event.listen(Engine, 'after_cursor_execute', self._after_query)
+            event.listen(Engine, 'handle_error', self._query_failed)
+
+    def add_collector(self, collect):
+        """
+        Registers a function returning extra Prometheus lines, called on every scrape.
+        """
+        if collect not in self._collectors:
+            self._collectors.append(collect)
+
+    def observe_llm(self, kind, duration, outcome, prompt_chars=0, output_chars=0):
+        self.llm_latency.observe(duration, kind, outcome)
+        self.llm_tokens.inc('prompt', amount=prompt_chars // 4)
+        self.llm_tokens.inc('output', amount=output_chars // 4)
+        if has_request_context() and 'metrics_phases' in g:
+            g.metrics_phases['llm'] += duration
+
+    def count_fallback(self, feature):
+        self.fallbacks.inc(feature)
+
+    def render(self):
+        lines = []
+        for metric in (self.request_latency, self.request_errors, self.db_queries, self.db_latency,
+                       self.llm_latency, self.llm_tokens, self.fallbacks):
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+    def _route(self):
+        if not has_request_context():
+            return 'background'
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_phases = {'db': 0.0, 'llm': 0.0, 'queries': 0}
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route, method, phases = self._route(), request.method, g.metrics_phases
+        if response.is_streamed:
+            # A streamed body (e.g. /chat/stream) is only produced after we return, so time it when it closes
+            response.call_on_close(lambda: self._record_request(started, route, method, response.status_code, phases))
+        else:
+            self._record_request(started, route, method, response.status_code, phases)
+        return response
+
+    def _record_request(self, started, route, method, status, phases):
+        duration = time.perf_counter() - started
+        self.request_latency.observe(duration, route, method, status)
+
+        if self.slow_request_ms and duration * 1000 >= self.slow_request_ms:
+            other = max(duration - phases['db'] - phases['llm'], 0)
+            print(f"Slow request: {method} {route} -> {status} in {duration * 1000:.0f}ms "
+                  f"(db {phases['db'] * 1000:.0f}ms over {phases['queries']} queries, "
+                  f"llm {phases['llm'] * 1000:.0f}ms, other {other * 1000:.0f}ms)")
+
+    def _teardown_request(self, error):
+        if error is not None:
+            self.request_errors.inc(self._route())
+
+    def _before_query(self, conn, cursor, statement, parameters, context, executemany):
+        # A connection runs one statement at a time, so one start time per connection is enough
+        conn.info['metrics_query_started'] = time.perf_counter()
+
+    def _after_query(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('metrics_query_started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        route = self._route()
+        self.db_queries.inc(route)
+        self.db_latency.observe(duration, route)
+        if has_request_context() and 'metrics_phases' in g:
+            g.metrics_phases['db'] += duration
+            g.metrics_phases['queries'] += 1
+
+    def _query_failed(self, exception_context):
+        # A failed statement never reaches _after_query, so forget its start time here
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop('metrics_query_started', None)
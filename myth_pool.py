@@ -0,0 +1,148 @@
+# This file keeps a small pool of ready-made myth/fact pairs in memory,
+# so the dashboard never has to wait for a Gemini call to show one.
+import json
+import random
+import threading
+import time
+
+
+class MythPool:
+    """
+    An in-memory pool of parsed MYTH/FACT pairs that a background thread keeps topped up.
+
+    Each entry expires after `ttl` seconds. When fewer than `low_watermark` fresh
+    entries are left, the worker is woken up and refills the pool back to `size`.
+    If the pool is empty (e.g. on first start or when the AI is down), a random
+    entry from the seeded fallback file is served instead.
+    """
+
+    def __init__(self, generate_fn, fallback_path, size=20, ttl=6 * 60 * 60, low_watermark=5, max_attempts=3,
+                 on_fallback=None):
+        self.generate_fn = generate_fn  # Returns {'myth': ..., 'fact': ...} or raises
+        self.on_fallback = on_fallback  # Optional callback, called whenever a fallback is served
+        self.size = size
+        self.ttl = ttl
+        self.low_watermark = low_watermark
+        self.max_attempts = max_attempts
+
+        self._entries = []  # List of (expires_at, entry) tuples
+        self._keys = set()  # Normalized myths, used to avoid duplicates
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+
+        self.fallbacks = load_fallback_myths(fallback_path)
+
+    def get(self):
+        """
+        Returns one myth/fact pair straight from memory and starts a refill if needed.
+        """
+        self._ensure_worker()
+
+        with self._lock:
+            self._drop_expired()
+            fresh = len(self._entries)
+            entry = random.choice(self._entries)[1] if self._entries else None
+
+        if fresh < self.low_watermark:
+            self._wake.set()
+
+        if entry is None:
+            if self.on_fallback:
+                self.on_fallback()
+            return dict(random.choice(self.fallbacks))
+        return dict(entry)
+
+    def add(self, entry):
+        """
+        Adds a new pair to the pool. Returns False if it is a duplicate or the pool is full.
+        """
+        key = normalize_myth(entry['myth'])
+        with self._lock:
+            if key in self._keys or len(self._entries) >= self.size:
+                return False
+            self._entries.append((time.monotonic() + self.ttl, entry))
+            self._keys.add(key)
+            return True
+
+    def refill(self):
+        """
+        Calls the generator until the pool is full again.
+        Gives up after `max_attempts` failures or duplicates in a row.
+        """
+        misses = 0
+        while misses < self.max_attempts:
+            with self._lock:
+                self._drop_expired()
+                if len(self._entries) >= self.size:
+                    return
+            try:
+                added = self.add(self.generate_fn())
+            except Exception as e:
+                print(f"Error refilling myth pool: {e}")
+                added = False
+            misses = 0 if added else misses + 1
+
+    def start(self):
+        """
+        Starts the background refill now instead of waiting for the first get().
+        """
+        self._ensure_worker()
+
+    def __len__(self):
+        with self._lock:
+            self._drop_expired()
+            return len(self._entries)
+
+    def _drop_expired(self):
+        # Must be called while holding self._lock
+        now = time.monotonic()
+        kept = [(expires_at, entry) for expires_at, entry in self._entries if expires_at > now]
+        if len(kept) != len(self._entries):
+            self._entries = kept
+            self._keys = {normalize_myth(entry['myth']) for _, entry in kept}
+
+    def _ensure_worker(self):
+        # The thread is started lazily so importing the app never spawns threads
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='myth-pool-refill', daemon=True)
+            self._worker.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            # Wake up when asked, or at least once per TTL so entries get replaced before they all expire
+            self._wake.wait(timeout=max(self.ttl / 2, 1))
+            self._wake.clear()
+            self.refill()
+
+
+def normalize_myth(text):
+    """
+    Lowercases and strips punctuation/extra spaces so near-identical myths count as duplicates.
+    """
+    cleaned = ''.join(ch for ch in text.lower() if ch.isalnum() or ch.isspace())
+    return ' '.join(cleaned.split())
+
+
+def load_fallback_myths(path):
+    """
+    Loads the seeded fallback myth/fact pairs from a JSON file.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            myths = [m for m in json.load(f) if m.get('myth') and m.get('fact')]
+        if myths:
+            return myths
+    except (OSError, ValueError) as e:
+        print(f"Error loading fallback myths from {path}: {e}")
+
+    # Last resort if the file is missing or broken
+    return [{
+        "myth": "Going out in the cold weather will give you a cold.",
+        "fact": "Fact: Colds are caused by viruses, not by cold air. You get sick by being exposed to a virus, often indoors."
+    }]
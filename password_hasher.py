@@ -0,0 +1,134 @@
+# This file runs bcrypt hashing on a small dedicated thread pool, so a burst of logins
+# can't tie up every web worker with CPU-heavy password checks.
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashing jobs are waiting (or one took too long). Routes turn this into a 503."""
+
+
+class PasswordHasher:
+    """
+    Wraps a Flask-Bcrypt instance with a bounded thread pool.
+
+    At most `max_workers` hashes run at once and at most `max_queue` may be waiting;
+    anything beyond that is rejected straight away with HasherBusy.
+    bcrypt releases the GIL while hashing, so threads are enough here.
+    """
+
+    def __init__(self, bcrypt, rounds=12, max_workers=2, max_queue=32, timeout=10.0):
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        """
+        Returns a new hash (as text) using the current cost.
+        """
+        hashed = self._run(self.bcrypt.generate_password_hash, password, self.rounds)
+        return hashed.decode('utf-8')
+
+    def check(self, password_hash, password):
+        """
+        Returns True if the password matches the stored hash.
+        """
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        True when the stored hash was made with a lower cost than the one we use now.
+        Hashes are only ever upgraded, never weakened.
+        """
+        rounds = hash_rounds(password_hash)
+        return rounds is not None and rounds < self.rounds
+
+    def calibrate(self, target_ms=250, min_rounds=12, max_rounds=15):
+        """
+        Picks the highest bcrypt cost whose hash time stays under `target_ms` on this machine.
+        It never goes below `min_rounds`, the cost our existing hashes were made with.
+
+        Only one hash is timed (at `min_rounds`); every extra round doubles the work,
+        so the rest is worked out from that measurement.
+        """
+        started = time.perf_counter()
+        self.bcrypt.generate_password_hash('calibration-password', min_rounds)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        rounds = min_rounds
+        while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+            elapsed_ms *= 2
+            rounds += 1
+
+        self.rounds = rounds
+        return rounds
+
+    def calibrate_once(self, path, target_ms=250):
+        """
+        Uses the cost saved in `path`, or calibrates and saves it there.
+        This pins one cost for every worker sharing the file, so timing noise between
+        workers can't make them disagree (and keep rehashing users back and forth).
+        """
+        saved = read_rounds(path)
+        if saved is not None:
+            self.rounds = saved
+            return saved
+
+        rounds = self.calibrate(target_ms=target_ms)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(rounds))
+        try:
+            os.link(tmp_path, path)  # Fails if another worker saved its cost first
+        except FileExistsError:
+            self.rounds = read_rounds(path) or rounds
+        except OSError as e:
+            print(f"Error saving the bcrypt cost to {path}: {e}")
+        finally:
+            os.remove(tmp_path)
+        return self.rounds
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise HasherBusy("Too many password hashing jobs waiting.")
+            self._pending += 1
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._job_done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeout:
+            raise HasherBusy("Password hashing took too long.")
+
+    def _job_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+
+def hash_rounds(password_hash):
+    """
+    Reads the cost out of a bcrypt hash such as '$2b$12$...'. Returns None if it can't.
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def read_rounds(path):
+    """
+    Reads a saved bcrypt cost. Returns None if the file is missing or unreadable.
+    """
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
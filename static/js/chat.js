@@ -24,26 +24,79 @@ chatForm.addEventListener('submit', async function(event) {
     appendMessage(userMessage, 'user-message');
     messageInput.value = ''; // Clear the input box
 
-    // 2. Send the message to the backend and get the bot's response
-    try {
-        const response = await fetch('/chat', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: userMessage })
-        });
-        const result = await response.json();
-        const botMessage = result.reply;
+    // 2. Create an empty bot message that we fill in as the reply streams in
+    const botElement = appendMessage('', 'bot-message');
 
-        // 3. Display the bot's message
-        appendMessage(botMessage, 'bot-message');
+    // 3. Send the message to the backend and show the bot's response as it arrives
+    try {
+        if (window.ReadableStream && window.TextDecoder) {
+            await streamReply(userMessage, botElement);
+        } else {
+            // Older browsers: fall back to waiting for the full reply
+            const response = await fetch('/chat', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ message: userMessage })
+            });
+            const result = await response.json();
+            botElement.innerText = result.reply;
+        }
 
     } catch (error) {
         // Handle any errors
         console.error('Error:', error);
-        appendMessage('Sorry, something went wrong. Please try again.', 'bot-message');
+        botElement.innerText = 'Sorry, something went wrong. Please try again.';
     }
+    chatHistory.scrollTop = chatHistory.scrollHeight;
 });
 
+// Reads the Server-Sent Events from /chat/stream and appends each chunk to the bot message
+async function streamReply(userMessage, botElement) {
+    const response = await fetch('/chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message: userMessage })
+    });
+    if (!response.ok) {
+        throw new Error(`Chat stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let dataLine = '';
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                if (line.startsWith('data:')) dataLine += line.slice(5).trim();
+            }
+
+            if (eventName === 'done') return;
+            const payload = dataLine ? JSON.parse(dataLine) : {};
+            if (eventName === 'error') {
+                botElement.innerText = payload.text;
+                continue;
+            }
+            if (payload.text) {
+                botElement.innerText += payload.text;
+                chatHistory.scrollTop = chatHistory.scrollHeight;
+            }
+        }
+    }
+}
+
 // A helper function to add a new message to the chat history
 function appendMessage(message, className) {
     const messageElement = document.createElement('div');
@@ -51,6 +104,7 @@ function appendMessage(message, className) {
     messageElement.innerText = message;
     chatHistory.appendChild(messageElement);
     chatHistory.scrollTop = chatHistory.scrollHeight; // Auto-scroll to the bottom
+    return messageElement;
 }
 
 // --- Async Myth Loader ---
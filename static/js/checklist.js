@@ -1,3 +1,13 @@
+// Checklist changes are not sent one by one. They are queued, merged and sent
+// together to /checklist/batch a moment after the user stops clicking.
+const BATCH_DELAY_MS = 400;
+
+let pendingOps = [];      // Operations waiting to be sent
+let batchTimer = null;    // Debounce timer
+let batchInFlight = null; // The request currently being sent, if any
+let tempCounter = 0;      // For ids of items the server hasn't saved yet
+const savedIds = {};      // temp id -> real item_id, filled in as batches come back
+
 document.addEventListener('DOMContentLoaded', function() {
     
     const checklistForm = document.getElementById('checklist-form');
@@ -6,29 +16,16 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- 1. LOGIC TO ADD A NEW ITEM ---
     if (checklistForm) {
-        checklistForm.addEventListener('submit', async function(event) {
+        checklistForm.addEventListener('submit', function(event) {
             event.preventDefault();
             const content = checklistInput.value.trim();
             if (!content) return;
 
-            try {
-                const response = await fetch('/add_checklist_item', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ content: content })
-                });
-                const result = await response.json();
-
-                if (response.ok) {
-                    addNewItemToUI(result.item);
-                    checklistInput.value = '';
-                } else {
-                    alert('Error: ' + result.message);
-                }
-            } catch (error) {
-                console.error('Error adding item:', error);
-                alert('An error occurred. Please try again.');
-            }
+            // Show the item right away with a temporary id, the batch will give it a real one
+            const tempId = `tmp-${++tempCounter}`;
+            addNewItemToUI({ item_id: tempId, content: content, is_completed: false });
+            queueChecklistOp({ op: 'add', temp_id: tempId, content: content });
+            checklistInput.value = '';
         });
     }
 
@@ -53,6 +50,14 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     }
+
+    // Send anything still queued when the user leaves the page
+    window.addEventListener('pagehide', function() {
+        if (pendingOps.length === 0) return;
+        const body = JSON.stringify({ ops: pendingOps.map(resolveOp) });
+        navigator.sendBeacon('/checklist/batch', new Blob([body], { type: 'application/json' }));
+        pendingOps = [];
+    });
 });
 
 // --- 3. HELPER FUNCTIONS ---
@@ -63,9 +68,10 @@ function addNewItemToUI(item) {
     li.dataset.id = item.item_id; // Add the data-id
     li.innerHTML = `
         <input type="checkbox" ${item.is_completed ? 'checked' : ''}>
-        <span>${item.content}</span>
+        <span></span>
         <button>&times;</button>
     `;
+    li.querySelector('span').innerText = item.content;
     
     // Add strikethrough if it's already completed
     if (item.is_completed) {
@@ -75,34 +81,103 @@ function addNewItemToUI(item) {
     checklist.appendChild(li);
 }
 
-async function updateChecklistItem(itemId, isCompleted, liElement) {
-    try {
-        await fetch(`/update_checklist_item/${itemId}`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ is_completed: isCompleted })
-        });
-        
-        // Update the UI instantly
-        liElement.classList.toggle('completed', isCompleted);
-    } catch (error) {
-        console.error('Error updating item:', error);
-    }
+function updateChecklistItem(itemId, isCompleted, liElement) {
+    // Update the UI instantly, the change is saved with the next batch
+    liElement.classList.toggle('completed', isCompleted);
+    queueChecklistOp({ op: 'toggle', item_id: itemId, is_completed: isCompleted });
 }
 
-async function deleteChecklistItem(itemId, liElement) {
+function deleteChecklistItem(itemId, liElement) {
     if (!confirm('Are you sure you want to delete this item?')) {
         return;
     }
     
-    try {
-        await fetch(`/delete_checklist_item/${itemId}`, {
-            method: 'POST'
-        });
-        
-        // Remove from the UI instantly
-        liElement.remove();
-    } catch (error) {
-        console.error('Error deleting item:', error);
+    // Remove from the UI instantly, the change is saved with the next batch
+    liElement.remove();
+    queueChecklistOp({ op: 'delete', item_id: itemId });
+}
+
+// Adds an operation to the queue, merging it with what is already waiting
+function queueChecklistOp(op) {
+    if (op.op === 'toggle') {
+        // Only the last toggle of an item matters
+        pendingOps = pendingOps.filter(p => !(p.op === 'toggle' && p.item_id === op.item_id));
+        const pendingAdd = pendingOps.find(p => p.op === 'add' && p.temp_id === op.item_id);
+        if (pendingAdd) {
+            pendingAdd.is_completed = op.is_completed;
+            return scheduleBatch();
+        }
+    }
+
+    if (op.op === 'delete') {
+        // Nothing else about a deleted item needs sending
+        pendingOps = pendingOps.filter(p => p.item_id !== op.item_id);
+        const addCount = pendingOps.length;
+        pendingOps = pendingOps.filter(p => !(p.op === 'add' && p.temp_id === op.item_id));
+        if (pendingOps.length !== addCount) {
+            return scheduleBatch(); // Never reached the server, so nothing to delete
+        }
     }
-}
\ No newline at end of file
+
+    pendingOps.push(op);
+    scheduleBatch();
+}
+
+function scheduleBatch() {
+    clearTimeout(batchTimer);
+    batchTimer = setTimeout(sendBatch, BATCH_DELAY_MS);
+}
+
+// Swaps temp ids for real ones if an earlier batch has saved those items already
+function resolveOp(op) {
+    const resolved = Object.assign({}, op);
+    if (resolved.item_id in savedIds) {
+        resolved.item_id = savedIds[resolved.item_id];
+    }
+    if (resolved.item_ids) {
+        resolved.item_ids = resolved.item_ids.map(id => savedIds[id] || id);
+    }
+    return resolved;
+}
+
+async function sendBatch() {
+    if (pendingOps.length === 0) return;
+
+    // Only one batch at a time, so later batches can use the ids returned by earlier ones
+    if (batchInFlight) {
+        await batchInFlight;
+        return scheduleBatch();
+    }
+
+    const ops = pendingOps.map(resolveOp);
+    pendingOps = [];
+
+    batchInFlight = (async () => {
+        try {
+            const response = await fetch('/checklist/batch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ops: ops })
+            });
+            const result = await response.json();
+
+            if (!response.ok) {
+                alert('Error: ' + result.message);
+                return;
+            }
+
+            // Give newly saved items their real ids
+            for (const added of result.added) {
+                savedIds[added.temp_id] = added.item.item_id;
+                const li = document.querySelector(`#checklist li[data-id="${added.temp_id}"]`);
+                if (li) li.dataset.id = added.item.item_id;
+            }
+        } catch (error) {
+            console.error('Error saving checklist:', error);
+            alert('An error occurred. Please try again.');
+        } finally {
+            batchInFlight = null;
+        }
+    })();
+    await batchInFlight;
+}
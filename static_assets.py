@@ -0,0 +1,157 @@
+# This file fingerprints our CSS and JS files and serves them with long-lived caching.
+# Each file is copied to static/dist/ under a name containing a hash of its content
+# (e.g. css/style.3f9a1c2b7d4e.css), next to .gz and .br copies. Because the name
+# changes whenever the content does, browsers can keep a copy for a year without asking again.
+import glob
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory, session
+
+try:
+    import brotli  # Optional: without it only gzip copies are made
+except ImportError:
+    brotli = None
+
+# Which files under the static folder are fingerprinted
+ASSET_PATTERNS = ('css/*.css', 'js/*.js')
+
+# Hashed files are never changed in place, so they can be cached for a year
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# Precompressed copies, in the order we prefer them: (Accept-Encoding name, file extension)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def build_assets(static_folder, out_dir='dist', patterns=ASSET_PATTERNS):
+    """
+    Writes the hashed and compressed copies and a manifest.json. Returns the manifest.
+    Copies that already exist are left alone, so running it again only writes what changed.
+    """
+    manifest = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(static_folder, pattern))):
+            # 1. Name the copy after a hash of the file's content
+            with open(path, 'rb') as f:
+                content = f.read()
+            filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            stem, ext = os.path.splitext(filename)
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            hashed = f'{out_dir}/{stem}.{digest}{ext}'
+
+            # 2. Write the copy and its compressed versions (only compressing the ones that are missing)
+            encodings = []
+            _write_once(static_folder, hashed, lambda: content)
+            _write_once(static_folder, hashed + '.gz', lambda: gzip.compress(content, compresslevel=9, mtime=0))
+            encodings.append('gzip')
+            if brotli is not None:
+                _write_once(static_folder, hashed + '.br', lambda: brotli.compress(content))
+                encodings.append('br')
+
+            manifest[filename] = {'path': hashed, 'encodings': encodings}
+
+    # 3. Save the manifest so a read-only deploy can use the one made by `flask build-assets`.
+    # Old hashed copies are kept on purpose: pages already open may still ask for them.
+    manifest_path = os.path.join(static_folder, out_dir, 'manifest.json')
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+    if load_manifest(manifest_path, quiet=True) != manifest:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        _write_atomic(manifest_path, data)
+    return manifest
+
+
+def _write_once(static_folder, name, make_data):
+    # make_data is only called when the file is missing, so a restart doesn't recompress everything
+    path = os.path.join(static_folder, name)
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, make_data())
+
+
+def _write_atomic(path, data):
+    # Several workers may build at the same time, so never leave a half-written file behind
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def pick_encoding(accept_encodings, available):
+    """
+    Returns the best precompressed encoding the browser accepts, or None for the plain file.
+    """
+    for encoding, _ in ENCODINGS:
+        if encoding in available and accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+class StaticAssets:
+    """
+    Points url_for('static', ...) at the hashed copies and serves them with immutable caching,
+    picking the .br or .gz copy from the Accept-Encoding header.
+    """
+
+    def __init__(self):
+        self.manifest = {}  # Original name -> {'path': hashed name, 'encodings': [...]}
+        self._hashed = {}  # Hashed name -> manifest entry
+
+    def init_app(self, app, out_dir='dist'):
+        try:
+            self.manifest = build_assets(app.static_folder, out_dir)
+        except OSError as e:
+            # E.g. a read-only deploy: fall back to the manifest from `flask build-assets`
+            print(f"Error building static assets, using the saved manifest: {e}")
+            self.manifest = load_manifest(os.path.join(app.static_folder, out_dir, 'manifest.json'))
+        self._hashed = {entry['path']: entry for entry in self.manifest.values()}
+
+        app.url_defaults(self._rewrite_url)
+        app.view_functions['static'] = self.send_static
+        # After-request hooks run in reverse order, so call init_app before the login manager's
+        # and this one runs after it has looked at the session
+        app.after_request(self._skip_session_vary)
+
+    def _rewrite_url(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]['path']
+
+    def _skip_session_vary(self, response):
+        # Everyone gets the same file, so don't let a session lookup add "Vary: Cookie",
+        # which would stop shared caches (CDNs, proxies) from keeping a copy
+        if request.endpoint == 'static' and response.headers.get('Cache-Control') == IMMUTABLE_CACHE:
+            session.accessed = False
+        return response
+
+    def send_static(self, filename):
+        entry = self._hashed.get(filename)
+        if entry is None:
+            # Anything that isn't fingerprinted is served the normal way
+            return current_app.send_static_file(filename)
+
+        encoding = pick_encoding(request.accept_encodings, entry['encodings'])
+        extension = dict(ENCODINGS)[encoding] if encoding else ''
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        response = send_from_directory(current_app.static_folder, filename + extension, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def load_manifest(path, quiet=False):
+    """
+    Reads a saved manifest, or returns an empty one (plain, unhashed URLs) if there is none.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        if not quiet:
+            print(f"Error loading static asset manifest {path}: {e}")
+        return {}
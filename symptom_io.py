@@ -0,0 +1,132 @@
+# Helpers for moving symptom history in and out of CogniCare in bulk (NDJSON or CSV).
+# Both directions use the same field names as the /log_symptom form.
+import csv
+import datetime
+import io
+import json
+
+FIELDS = ['log_date', 'symptom', 'severity', 'notes']
+SEVERITIES = {'Mild', 'Moderate', 'Severe'}
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def detect_format(requested, content_type):
+    """
+    Picks 'ndjson' or 'csv' from a ?format= value or the request's Content-Type.
+    """
+    if requested:
+        return requested.lower() if requested.lower() in FORMATS else None
+    if content_type and 'csv' in content_type:
+        return 'csv'
+    return 'ndjson'
+
+
+def read_rows(stream, fmt):
+    """
+    Yields (line_number, raw_dict) from a binary stream without loading it all into memory.
+    Lines that can't be parsed are yielded as (line_number, None).
+    """
+    # utf-8-sig drops the byte order mark Excel puts at the start, which would otherwise
+    # become part of the first column name ("\ufefflog_date")
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def clean_row(raw):
+    """
+    Validates one imported row. Returns (row, None) when it is fine, or (None, error message).
+    """
+    if raw is None:
+        return None, 'Row could not be parsed.'
+
+    symptom = text_field(raw, 'symptom')
+    if not symptom or len(symptom) > 100:
+        return None, 'symptom is required and must be at most 100 characters of text.'
+
+    try:
+        log_date = datetime.date.fromisoformat((text_field(raw, 'log_date') or '')[:10])
+    except ValueError:
+        return None, 'log_date must be a date like 2024-05-26.'
+
+    severity = text_field(raw, 'severity')
+    if severity is None or (severity and severity not in SEVERITIES):
+        return None, 'severity must be Mild, Moderate or Severe.'
+
+    notes = raw.get('notes') or None
+    if notes is not None and not isinstance(notes, str):
+        return None, 'notes must be text.'
+    return {'symptom_name': symptom, 'log_date': log_date, 'severity': severity or None, 'notes': notes}, None
+
+
+def text_field(raw, name):
+    """
+    Returns a field as stripped text ('' when missing), or None when it isn't text (e.g. a JSON number).
+    """
+    value = raw.get(name)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        return None
+    return value.strip()
+
+
+def export_chunks(rows, fmt, chunk_size=500):
+    """
+    Turns (log_date, symptom_name, severity, notes) tuples into text chunks of about `chunk_size` rows.
+    """
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDS)
+
+    count = 0
+    for log_date, symptom_name, severity, notes in rows:
+        if writer:
+            writer.writerow([log_date.isoformat(), symptom_name, severity or '', notes or ''])
+        else:
+            buffer.write(json.dumps({
+                'log_date': log_date.isoformat(),
+                'symptom': symptom_name,
+                'severity': severity,
+                'notes': notes
+            }) + '\n')
+
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def copy_csv(user_id, rows):
+    """
+    Formats validated rows as CSV text for Postgres COPY ... FROM STDIN.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([user_id, row['symptom_name'], row['log_date'].isoformat(),
+                         row['severity'] if row['severity'] is not None else '',
+                         row['notes'] if row['notes'] is not None else ''])
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,35 @@
+# Lets the tests import the app's modules (llm_gateway.py, answer_cache.py, ...) from the repo root,
+# and provides an app on a fresh SQLite database with the stub AI backend.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path):
+    import app as cognicare
+
+    flask_app = cognicare.create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'LLM_BACKEND': 'stub',
+        'BCRYPT_LOG_ROUNDS': 4,
+        'STATIC_FINGERPRINT': False
+    })
+    with flask_app.app_context():
+        cognicare.db.create_all()
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as a freshly registered user."""
+    client = app.test_client()
+    client.post('/register', json={'name': 'Asha', 'email': 'asha@example.com', 'age': 30,
+                                   'gender': 'f', 'password': 'secret'})
+    response = client.post('/login', json={'email': 'asha@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+    return client
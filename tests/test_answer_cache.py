@@ -0,0 +1,61 @@
+# Tests for the chatbot answer cache: rewordings may share an answer, different questions never do.
+import pytest
+
+from answer_cache import AnswerCache, normalize_question
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(max_size=100, ttl=60)
+
+
+def test_same_question_with_other_filler_words_is_an_exact_hit(cache):
+    cache.set('how to prevent dengue', 'Use mosquito nets.')
+    assert cache.get('How do I prevent dengue?') == 'Use mosquito nets.'
+    assert cache.stats()['hits'] == 1
+
+
+def test_near_copy_is_a_hit_only_above_the_threshold():
+    # A word typed twice: 4 of the 5 word pairs are shared
+    loose, strict = AnswerCache(threshold=0.8), AnswerCache(threshold=0.9)
+    for cache in (loose, strict):
+        cache.set('dengue fever symptoms', 'Fever, headache and joint pain.')
+    assert loose.get('dengue fever fever symptoms') == 'Fever, headache and joint pain.'
+    assert loose.stats()['similar_hits'] == 1
+    assert strict.get('dengue fever fever symptoms') is None
+
+
+@pytest.mark.parametrize('cached, asked', [
+    # Ordinals
+    ('is it safe to take ibuprofen during the third trimester of pregnancy',
+     'is it safe to take ibuprofen during the first trimester of pregnancy'),
+    # Negations
+    ('is it not safe to drink alcohol while taking antibiotics',
+     'is it safe to drink alcohol while taking antibiotics'),
+    ("isn't it safe to drink alcohol while taking antibiotics",
+     'is it safe to drink alcohol while taking antibiotics'),
+    ('can I exercise without eating breakfast first',
+     'can I exercise eating breakfast first'),
+    # Numbers
+    ('is it safe to take 2 paracetamol tablets at once',
+     'is it safe to take 4 paracetamol tablets at once'),
+    # Same words in another order
+    ('can I take ibuprofen after paracetamol', 'can I take paracetamol after ibuprofen'),
+    ('does diabetes cause heart disease', 'does heart disease cause diabetes'),
+    # One extra content word
+    ('how much water should a child drink daily',
+     'how much water should a diabetic child drink daily'),
+])
+def test_questions_that_differ_in_meaning_never_share_an_answer(cache, cached, asked):
+    cache.set(cached, 'cached answer')
+    assert cache.get(asked) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_answers_are_kept_per_scope(cache):
+    cache.set('how to prevent dengue', 'Answer for children.', scope='child')
+    assert cache.get('how to prevent dengue', scope='adult') is None
+
+
+def test_contractions_stay_one_word():
+    assert normalize_question("Isn't it safe?") == ['isnt', 'safe']
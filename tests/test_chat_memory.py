@@ -0,0 +1,46 @@
+# Tests for folding older chat messages into the rolling summary.
+import pytest
+
+from app import ChatSummary, ChatTurn, compact_conversation, db
+
+
+def add_turns(app, questions):
+    with app.app_context():
+        for n, question in enumerate(questions):
+            db.session.add_all([ChatTurn(user_id=1, role='u', content=question, created_at=n),
+                                ChatTurn(user_id=1, role='a', content='An answer.', created_at=n)])
+        db.session.commit()
+
+
+def summarize(app, responder):
+    app.extensions['cognicare'].llm.backend.responder = responder
+    compact_conversation(app, 1)
+    with app.app_context():
+        return db.session.get(ChatSummary, 1).summary
+
+
+@pytest.fixture
+def max_chars(app):
+    return app.config['CHAT_CONTEXT_TOKEN_BUDGET'] * 4 // 3
+
+
+def test_long_ai_summary_keeps_its_beginning(app, client, max_chars):
+    add_turns(app, [f'question {n}' for n in range(10)])
+    summary = summarize(app, lambda prompt: 'The user has asthma. ' + 'More detail. ' * 500)
+    assert summary.startswith('The user has asthma.')
+    assert len(summary) <= max_chars
+    with app.app_context():
+        assert ChatTurn.query.count() == app.config['CHAT_WINDOW_MESSAGES']
+
+
+def test_fallback_summary_keeps_the_newest_questions(app, client, max_chars):
+    def broken(prompt):
+        raise ConnectionError("upstream down")
+
+    with app.app_context():
+        db.session.add(ChatSummary(user_id=1, summary='Oldest topic. ' + 'Earlier detail. ' * 100, updated_at=0))
+        db.session.commit()
+    add_turns(app, [f'question {n}' for n in range(10)])
+    summary = summarize(app, broken)
+    assert summary.endswith('question 6') and 'Oldest topic' not in summary
+    assert len(summary) <= max_chars
@@ -0,0 +1,73 @@
+# Tests for POST /checklist/batch: one transaction, temp ids for new items, reordering and validation.
+import pytest
+
+from app import ChecklistItem
+
+
+def batch(client, *ops):
+    return client.post('/checklist/batch', json={'ops': list(ops)})
+
+
+def saved_items(app):
+    with app.app_context():
+        items = ChecklistItem.query.order_by(ChecklistItem.position.asc().nulls_last(), ChecklistItem.item_id).all()
+        return [(item.content, item.is_completed) for item in items]
+
+
+def test_new_items_can_be_toggled_and_deleted_by_temp_id(app, client):
+    response = batch(client,
+                     {'op': 'add', 'temp_id': 'tmp-1', 'content': 'Drink water'},
+                     {'op': 'add', 'temp_id': 'tmp-2', 'content': 'Walk'},
+                     {'op': 'add', 'temp_id': 'tmp-3', 'content': 'Stretch'},
+                     {'op': 'toggle', 'item_id': 'tmp-2', 'is_completed': True},
+                     {'op': 'delete', 'item_id': 'tmp-3'})
+    assert response.status_code == 200
+    assert [added['temp_id'] for added in response.json['added']] == ['tmp-1', 'tmp-2']
+    assert saved_items(app) == [('Drink water', False), ('Walk', True)]
+
+
+def test_existing_items_are_toggled_deleted_and_reordered(app, client):
+    added = batch(client,
+                  {'op': 'add', 'temp_id': 'a', 'content': 'First'},
+                  {'op': 'add', 'temp_id': 'b', 'content': 'Second'},
+                  {'op': 'add', 'temp_id': 'c', 'content': 'Third'}).json['added']
+    first, second, third = (entry['item']['item_id'] for entry in added)
+
+    response = batch(client,
+                     {'op': 'toggle', 'item_id': first, 'is_completed': True},
+                     {'op': 'delete', 'item_id': second},
+                     {'op': 'add', 'temp_id': 'd', 'content': 'Fourth'},
+                     {'op': 'reorder', 'item_ids': ['d', third, second, str(first)]})
+    assert response.status_code == 200
+    assert response.json['updated'] == 1 and response.json['deleted'] == 1
+    assert saved_items(app) == [('Fourth', False), ('Third', False), ('First', True)]
+
+
+def test_other_users_items_are_not_touched(app, client):
+    item_id = batch(client, {'op': 'add', 'content': 'Mine'}).json['added'][0]['item']['item_id']
+
+    other = app.test_client()
+    other.post('/register', json={'name': 'Ravi', 'email': 'ravi@example.com', 'age': 40,
+                                  'gender': 'm', 'password': 'secret'})
+    other.post('/login', json={'email': 'ravi@example.com', 'password': 'secret'})
+    response = batch(other, {'op': 'delete', 'item_id': item_id})
+    assert response.json['deleted'] == 0
+    assert saved_items(app) == [('Mine', False)]
+
+
+@pytest.mark.parametrize('ops', [
+    [{'op': 'toggle', 'item_id': 1, 'is_completed': 'false'}],
+    [{'op': 'toggle', 'item_id': 1}],
+    [{'op': 'add', 'content': 'x', 'is_completed': 1}],
+    [{'op': 'add', 'temp_id': 'dup', 'content': 'x'}, {'op': 'add', 'temp_id': 'dup', 'content': 'y'}],
+    [{'op': 'toggle', 'item_id': [1], 'is_completed': True}],
+    [{'op': 'delete', 'item_id': {'id': 1}}],
+    [{'op': 'add', 'content': 5}],
+    [{'op': 'reorder', 'item_ids': [[1]]}],
+    [{'op': 'toggle', 'item_id': 'tmp-unknown', 'is_completed': True}],
+    [{'op': 'explode'}],
+])
+def test_invalid_batches_are_rejected_without_saving_anything(app, client, ops):
+    response = batch(client, {'op': 'add', 'content': 'Should not be saved'}, *ops)
+    assert response.status_code == 400
+    assert saved_items(app) == []
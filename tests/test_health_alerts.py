@@ -0,0 +1,51 @@
+# Tests for the health alert rules: a broken rules file must never break the dashboard.
+import datetime
+import json
+
+import pytest
+
+from health_alerts import AlertEngine, compile_rules
+
+SEPTEMBER = datetime.date(2024, 9, 15)
+
+
+def rules(**rule):
+    return {
+        'levels': {'High Risk': {'priority': 3, 'color_class': 'alert-red'}},
+        'default': {'level': 'Low Risk', 'illness': 'General Alert', 'message': 'All clear.'},
+        'rules': [dict({'regions': ['Bengaluru'], 'months': [9], 'illness': 'Dengue Fever',
+                        'level': 'High Risk', 'message': 'Clear stagnant water.'}, **rule)]
+    }
+
+
+@pytest.mark.parametrize('bad', [
+    {'months': 9},
+    {'months': ['9']},
+    {'months': [13]},
+    {'months': [True]},
+    {'regions': 'Bengaluru'},
+    {'regions': [None]},
+    {'level': ['High Risk']},
+])
+def test_rules_with_wrong_types_are_rejected(bad):
+    with pytest.raises(ValueError):
+        compile_rules(rules(**bad))
+
+
+def test_broken_rules_file_keeps_the_previous_rules(tmp_path):
+    path = tmp_path / 'health_alerts.json'
+    path.write_text(json.dumps(rules()))
+    engine = AlertEngine(str(path), reload_interval=0)
+    assert engine.get_alert('Bengaluru', SEPTEMBER)['illness'] == 'Dengue Fever'
+
+    for broken in ({'months': 9}, {'regions': 'Bengaluru'}, {'season': ['monsoon'], 'months': None}):
+        path.write_text(json.dumps(rules(**broken)))
+        engine._mtime = None  # Same-second writes can keep the old mtime
+        assert engine.get_alert('Bengaluru', SEPTEMBER)['illness'] == 'Dengue Fever'
+
+
+def test_broken_rules_file_at_startup_uses_the_default_alert(tmp_path):
+    path = tmp_path / 'health_alerts.json'
+    path.write_text(json.dumps(rules(months=9)))
+    engine = AlertEngine(str(path))
+    assert engine.get_alert('Bengaluru', SEPTEMBER)['illness'] == 'General Alert'
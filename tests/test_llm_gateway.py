@@ -0,0 +1,93 @@
+# Tests for the AI gateway, run against the local stub backend (no network needed).
+import threading
+import time
+
+import pytest
+
+from llm_gateway import LLMGateway, LLMUnavailable, StubBackend
+
+
+def trip_breaker(gateway):
+    # Fail enough calls in a row to open the circuit
+    for _ in range(gateway.breaker.threshold):
+        gateway.breaker.record_failure()
+    assert gateway.breaker.is_open
+
+
+def test_dropped_trial_stream_does_not_leave_breaker_stuck():
+    gateway = LLMGateway(StubBackend(), breaker_threshold=2, breaker_cooldown=0.05)
+    trip_breaker(gateway)
+    with pytest.raises(LLMUnavailable):
+        gateway.generate('while open')
+
+    # After the cooldown one trial stream gets through, and the client hangs up mid-way
+    time.sleep(0.06)
+    stream = gateway.stream('trial')
+    next(stream)
+    stream.close()
+
+    # The next caller may run a new trial instead of failing fast forever
+    assert gateway.generate('after the dropped trial')
+    assert not gateway.breaker.is_open
+
+
+def test_finished_trial_stream_closes_breaker():
+    gateway = LLMGateway(StubBackend(), breaker_threshold=2, breaker_cooldown=0.05)
+    trip_breaker(gateway)
+    time.sleep(0.06)
+
+    assert ''.join(gateway.stream('trial'))
+    assert not gateway.breaker.is_open
+
+
+def test_failed_call_is_retried():
+    attempts = []
+
+    def flaky(prompt):
+        attempts.append(prompt)
+        if len(attempts) == 1:
+            raise ConnectionError("upstream hiccup")
+        return 'ok'
+
+    gateway = LLMGateway(StubBackend(responder=flaky), max_retries=1)
+    assert gateway.generate('hello') == 'ok'
+    assert len(attempts) == 2
+    assert gateway.breaker.failures == 0
+
+
+def test_retries_give_up_and_count_one_failure():
+    def broken(prompt):
+        raise ConnectionError("upstream down")
+
+    backend = StubBackend(responder=broken)
+    gateway = LLMGateway(backend, max_retries=2)
+    with pytest.raises(ConnectionError):
+        gateway.generate('hello')
+    assert backend.calls == 3
+    assert gateway.breaker.failures == 1
+
+
+def test_identical_prompts_are_coalesced():
+    backend = StubBackend(latency=0.2)
+    gateway = LLMGateway(backend)
+    results = []
+
+    def ask():
+        results.append(gateway.generate('same question'))
+
+    threads = [threading.Thread(target=ask) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert len(results) == 5 and len(set(results)) == 1
+
+
+def test_different_prompts_are_not_coalesced():
+    backend = StubBackend()
+    gateway = LLMGateway(backend)
+    gateway.generate('one')
+    gateway.generate('two')
+    assert backend.calls == 2
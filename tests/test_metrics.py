@@ -0,0 +1,31 @@
+# Tests for the request and database metrics.
+from sqlalchemy import text
+
+from app import db, metrics
+
+
+def request_count(route):
+    series = metrics.request_latency._values
+    return sum(values[-1] for labels, values in series.items() if labels[0] == route)
+
+
+def test_streamed_response_is_timed_when_it_closes(client):
+    before = request_count('/chat/stream')
+    response = client.post('/chat/stream', json={'message': 'how to prevent dengue'})
+    assert request_count('/chat/stream') == before
+
+    assert b'event: done' in response.get_data()
+    response.close()
+    assert request_count('/chat/stream') == before + 1
+
+
+def test_failed_query_leaves_no_start_time_behind(app):
+    with app.app_context():
+        connection = db.session.connection()
+        for _ in range(3):
+            try:
+                connection.execute(text('SELECT * FROM no_such_table'))
+            except Exception:
+                db.session.rollback()
+                connection = db.session.connection()
+        assert 'metrics_query_started' not in connection.info
@@ -0,0 +1,18 @@
+# Tests for the fingerprinted static files.
+import gzip
+
+import static_assets
+from static_assets import build_assets
+
+
+def test_second_build_does_not_compress_again(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_text('body { color: teal; }')
+    manifest = build_assets(str(tmp_path))
+    hashed = manifest['css/style.css']['path']
+    assert gzip.decompress((tmp_path / (hashed + '.gz')).read_bytes()) == b'body { color: teal; }'
+
+    calls = []
+    monkeypatch.setattr(static_assets.gzip, 'compress', lambda *args, **kwargs: calls.append(args))
+    assert build_assets(str(tmp_path)) == manifest
+    assert calls == []
@@ -0,0 +1,35 @@
+# Tests for reading and validating bulk symptom imports.
+import datetime
+import io
+
+import pytest
+
+from symptom_io import clean_row, read_rows
+
+CSV = 'log_date,symptom,severity,notes\n2024-05-26,Headache,Mild,after lunch\n'
+
+
+@pytest.mark.parametrize('data', [CSV.encode('utf-8'), CSV.encode('utf-8-sig')])
+def test_csv_with_or_without_byte_order_mark(data):
+    rows = [clean_row(raw) for _, raw in read_rows(io.BytesIO(data), 'csv')]
+    assert rows == [({'symptom_name': 'Headache', 'log_date': datetime.date(2024, 5, 26),
+                      'severity': 'Mild', 'notes': 'after lunch'}, None)]
+
+
+def test_ndjson_with_byte_order_mark():
+    data = '{"log_date": "2024-05-26", "symptom": "Fever"}\n'.encode('utf-8-sig')
+    [(line_number, raw)] = read_rows(io.BytesIO(data), 'ndjson')
+    assert line_number == 1 and raw['symptom'] == 'Fever'
+
+
+@pytest.mark.parametrize('raw', [
+    {'symptom': 5, 'log_date': '2024-05-26'},
+    {'symptom': 'Fever', 'log_date': 20240526},
+    {'symptom': 'Fever', 'log_date': '2024-05-26', 'severity': 3},
+    {'symptom': 'Fever', 'log_date': '2024-05-26', 'notes': ['x']},
+    {'symptom': 'Fever', 'log_date': '2024-05-26', 'severity': 'Unbearable'},
+    None,
+])
+def test_bad_rows_are_reported_not_raised(raw):
+    row, error = clean_row(raw)
+    assert row is None and error
@@ -0,0 +1,95 @@
+# Tests for the symptom_rollups table and the /api/symptom_stats streaks built on it.
+import datetime
+import json
+
+from app import SymptomLog, SymptomRollup, db, rollup_counts, streak_ending, upsert_rollups
+
+TODAY = datetime.date.today()
+
+
+def days_ago(n):
+    return TODAY - datetime.timedelta(days=n)
+
+
+def import_logs(client, dates, symptom='Headache', severity='Mild'):
+    body = ''.join(json.dumps({'log_date': d.isoformat(), 'symptom': symptom, 'severity': severity}) + '\n'
+                   for d in dates)
+    response = client.post('/symptoms/import', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 201
+
+
+def rollups(app, period):
+    with app.app_context():
+        rows = SymptomRollup.query.filter_by(period=period).all()
+        return {(r.period_start, r.symptom_name, r.severity): r.count for r in rows}
+
+
+def test_rollup_counts_adds_up_days_and_monday_weeks():
+    wednesday, thursday = datetime.date(2024, 5, 22), datetime.date(2024, 5, 23)
+    counts = rollup_counts(7, [(wednesday, 'Cough', 'Mild'), (wednesday, 'Cough', 'Mild'),
+                               (thursday, 'Cough', None)])
+    monday = datetime.date(2024, 5, 20)
+    assert counts == {
+        (7, 'day', wednesday, 'Cough', 'Mild'): 2,
+        (7, 'day', thursday, 'Cough', ''): 1,
+        (7, 'week', monday, 'Cough', 'Mild'): 2,
+        (7, 'week', monday, 'Cough', ''): 1,
+    }
+
+
+def test_upsert_rollups_adds_to_existing_counts(app, client):
+    key = (1, 'day', datetime.date(2024, 5, 22), 'Cough', 'Mild')
+    with app.app_context():
+        upsert_rollups({key: 2})
+        upsert_rollups({key: 3})
+        db.session.commit()
+    assert rollups(app, 'day') == {(datetime.date(2024, 5, 22), 'Cough', 'Mild'): 5}
+
+
+def test_backfill_rebuilds_rollups_from_the_logs(app, client):
+    import_logs(client, [days_ago(0), days_ago(0), days_ago(1)])
+    expected_days, expected_weeks = rollups(app, 'day'), rollups(app, 'week')
+
+    # Throw the rollups off, then rebuild them from symptom_logs
+    with app.app_context():
+        db.session.query(SymptomRollup).update({'count': 99})
+        db.session.add(SymptomRollup(user_id=1, period='day', period_start=days_ago(5),
+                                     symptom_name='Stale', severity='', count=1))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['backfill-rollups'])
+    assert 'Rolled up 3 symptom logs.' in result.output
+
+    assert rollups(app, 'day') == expected_days == {(days_ago(0), 'Headache', 'Mild'): 2,
+                                                    (days_ago(1), 'Headache', 'Mild'): 1}
+    assert rollups(app, 'week') == expected_weeks
+    with app.app_context():
+        assert SymptomLog.query.count() == 3
+
+
+def test_streaks_within_the_window(client):
+    # Logged today and yesterday, then a gap, then 4 days in a row
+    import_logs(client, [days_ago(n) for n in (0, 1, 5, 6, 7, 8)])
+    stats = client.get('/api/symptom_stats?days=30').json
+    assert stats['current_streak'] == 2
+    assert stats['longest_streak'] == 4
+    assert stats['active_days'] == 6
+
+
+def test_current_streak_may_start_yesterday(client):
+    import_logs(client, [days_ago(n) for n in (1, 2, 3)])
+    assert client.get('/api/symptom_stats').json['current_streak'] == 3
+
+
+def test_current_streak_is_not_capped_by_the_window(client):
+    import_logs(client, [days_ago(n) for n in range(90)])
+    stats = client.get('/api/symptom_stats?days=30').json
+    assert stats['current_streak'] == 90
+    assert stats['longest_streak'] == 30  # The longest streak is only measured inside the window
+
+
+def test_streak_ending_reads_across_chunks(app, client):
+    import_logs(client, [days_ago(n) for n in range(20)] + [days_ago(25)])
+    with app.app_context():
+        assert streak_ending(1, TODAY, chunk_size=7) == 20
+        assert streak_ending(1, days_ago(25), chunk_size=7) == 1
+        assert streak_ending(1, days_ago(21), chunk_size=7) == 0